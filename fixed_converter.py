@@ -10,10 +10,41 @@ Correções principais:
 - Suporte correto a sub-busing
 """
 
+import io
 import json
+import operator
+import os
 import sys
-from typing import Dict, List, Set, Optional, Tuple
-from collections import defaultdict
+from typing import Dict, List, Set, Optional, TextIO, Tuple, Union
+from collections import Counter
+
+try:
+    import orjson  # Opcional: parser em C, bem mais rápido em netlists grandes
+except ImportError:
+    orjson = None
+
+
+# Mapeamento de chips DLS específicos para chips Hack (None = chip inexistente)
+_NAME_MAP: Dict[str, Optional[str]] = {
+    "NAND": "Nand",
+    "NOT": "Not",
+    "AND": "And",
+    "OR": "Or",
+    "XOR": "Xor",
+    "MUX": "Mux",
+    "DMUX": "DMux",
+    # Chips que NÃO EXISTEM no Hack (remover)
+    "8-1BIT": None,  # ❌ Splitter - usar sub-busing
+    "1-8BIT": None,  # ❌ Bus - usar sub-busing
+    "Splitter8": None,
+    "Bus8": None,
+}
+
+# Extrai (PinID, PinOwnerID) de um SourcePinAddress/TargetPinAddress
+_GET_PIN = operator.itemgetter("PinID", "PinOwnerID")
+
+# Classificação de um PinOwnerID que não pertence ao chip (nem pino, nem componente)
+_UNKNOWN_OWNER: Tuple[Optional[str], object] = (None, None)
 
 
 class HackChipAPI:
@@ -54,11 +85,22 @@ class HackChipAPI:
         "PC": {"inputs": ["in", "load", "inc", "reset"], "outputs": ["out"]},
     }
 
+    # Mesma API já desempacotada: nome -> (inputs, outputs) como tuplas
+    CHIPS_SPEC = {
+        name: (tuple(spec["inputs"]), tuple(spec["outputs"]))
+        for name, spec in CHIPS.items()
+    }
+
     @classmethod
     def get_chip_spec(cls, chip_name: str) -> Optional[Dict]:
         """Retorna especificação do chip ou None se não existir"""
         return cls.CHIPS.get(chip_name)
 
+    @classmethod
+    def get_io(cls, chip_name: str) -> Optional[Tuple[Tuple[str, ...], Tuple[str, ...]]]:
+        """Retorna (inputs, outputs) do chip ou None se não existir"""
+        return cls.CHIPS_SPEC.get(chip_name)
+
     @classmethod
     def is_valid_chip(cls, chip_name: str) -> bool:
         """Verifica se o chip existe no Hack chip-set"""
@@ -67,17 +109,33 @@ class HackChipAPI:
 
 class Wire:
     """Representa uma conexão entre pinos"""
+    __slots__ = (
+        "source_pin_id", "source_owner_id", "target_pin_id", "target_owner_id",
+        "source_is_input", "source_comp", "target_is_output", "target_comp",
+    )
+
     def __init__(self, wire_data: dict):
-        self.source_pin_id = wire_data["SourcePinAddress"]["PinID"]
-        self.source_owner_id = wire_data["SourcePinAddress"]["PinOwnerID"]
-        self.target_pin_id = wire_data["TargetPinAddress"]["PinID"]
-        self.target_owner_id = wire_data["TargetPinAddress"]["PinOwnerID"]
+        self.source_pin_id, self.source_owner_id = _GET_PIN(wire_data["SourcePinAddress"])
+        self.target_pin_id, self.target_owner_id = _GET_PIN(wire_data["TargetPinAddress"])
+
+        # Classificação das pontas (preenchida pelo conversor ao mapear os wires)
+        self.source_is_input = False
+        self.source_comp: Optional["Component"] = None
+        self.target_is_output = False
+        self.target_comp: Optional["Component"] = None
 
 
 class Component:
     """Representa um componente (SubChip)"""
+    __slots__ = (
+        "name", "id", "label", "output_pin_ids",
+        "input_wires", "output_wires", "input_pin_order", "output_pin_order",
+        "input_pin_names", "output_pin_names", "normalized_name", "chip_io", "emit_plan",
+    )
+
     def __init__(self, subchip_data: dict):
-        self.name = subchip_data["Name"]
+        # Internar: o mesmo nome se repete em muitos componentes e é chave de dict
+        self.name = sys.intern(subchip_data["Name"])
         self.id = subchip_data["ID"]
         self.label = subchip_data.get("Label", "")
 
@@ -86,21 +144,35 @@ class Component:
         for pin_info in subchip_data.get("OutputPinColourInfo", []):
             self.output_pin_ids.append(pin_info["PinID"])
 
-        # Mapas de PinID -> lista de Wires
-        self.input_wires: Dict[int, List[Wire]] = defaultdict(list)
-        self.output_wires: Dict[int, List[Wire]] = defaultdict(list)
+        # Mapas de PinID -> lista de Wires (listas criadas só para pinos conectados)
+        self.input_wires: Dict[int, List[Wire]] = {}
+        self.output_wires: Dict[int, List[Wire]] = {}
+
+        # PinIDs conectados na ordem em que aparecem nos wires (ordem de inserção)
+        self.input_pin_order: List[int] = []
+        self.output_pin_order: List[int] = []
 
         # Mapas de PinID -> nome do pino (será preenchido depois)
         self.input_pin_names: Dict[int, str] = {}
         self.output_pin_names: Dict[int, str] = {}
 
+        # Nome normalizado e (inputs, outputs) do Hack (resolvidos uma vez pelo conversor)
+        self.normalized_name: Optional[str] = None
+        self.chip_io: Optional[Tuple[Tuple[str, ...], Tuple[str, ...]]] = None
+
+        # Conexões do HDL na ordem de emissão: (pino do componente, é output?,
+        # wire de entrada ou lista de wires do output) - montado no primeiro convert_to()
+        self.emit_plan: List[Tuple[str, bool, Union[Wire, List[Wire]]]] = []
+
 
 class FixedConverter:
     def __init__(self, json_data: dict):
         self.data = json_data
 
-        # Warnings - inicializar ANTES de chamar _normalize_chip_name
+        # Warnings e cache de nomes - inicializar ANTES de chamar _normalize_chip_name
         self.warnings: List[str] = []
+        self._norm_cache: Dict[str, Optional[str]] = {}
+        self._emitted_warnings: Set[str] = set()
 
         self.chip_name = self._normalize_chip_name(json_data.get("Name", "UnknownChip"))
 
@@ -108,23 +180,70 @@ class FixedConverter:
         self.input_pins = {pin["ID"]: pin for pin in json_data.get("InputPins", [])}
         self.output_pins = {pin["ID"]: pin for pin in json_data.get("OutputPins", [])}
 
+        # Largura (BitCount) de cada input, consultada a cada wire vindo de um input
+        self._input_pin_bits = {pin_id: pin["BitCount"] for pin_id, pin in self.input_pins.items()}
+
+        # Posição de cada output na assinatura e, se o chip principal existir
+        # na API do Hack, os nomes oficiais desses outputs
+        self._output_pin_index = {pin_id: idx for idx, pin_id in enumerate(self.output_pins)}
+        main_io = HackChipAPI.get_io(self.chip_name)
+        self._main_output_names = main_io[1] if main_io else None
+
+        # Nome desambiguado de cada pino, usado na assinatura IN/OUT e nas
+        # conexões do PARTS. Os inputs sempre concordam; os outputs só quando o
+        # chip principal não está na API do Hack. Se estiver, o PARTS usa
+        # _main_output_names (ex.: HalfAdder com outputs S/C gera "OUT s, c;"
+        # mas "out=sum"/"out=carry") - divergência conhecida
+        self._input_pin_signame = self._disambiguate_pin_names(self.input_pins)
+        self._output_pin_signame = self._disambiguate_pin_names(self.output_pins)
+
         # Componentes indexados por ID
         self.components: Dict[int, Component] = {}
         for subchip_data in json_data.get("SubChips", []):
             comp = Component(subchip_data)
             self.components[comp.id] = comp
+        # Ordem de iteração cacheada (comp.id == chave em self.components)
+        self._components_list = tuple(self.components.values())
+        self._resolve_components()
+
+        # Classificação de cada PinOwnerID: ("input" | "output" | "component", objeto)
+        self._owner_kind: Dict[int, Tuple[str, object]] = {}
+        for pin_id, pin in self.input_pins.items():
+            self._owner_kind[pin_id] = ("input", pin)
+        for pin_id, pin in self.output_pins.items():
+            self._owner_kind[pin_id] = ("output", pin)
+        for comp in self._components_list:
+            self._owner_kind[comp.id] = ("component", comp)
 
         # Processar conexões
         self.wires = [Wire(w) for w in json_data.get("Wires", [])]
         self._map_wires_to_components()
         self._infer_pin_names()
+        self._emit_plans_built = False  # Montados sob demanda em convert_to()
 
         # Contador de wires internos
         self.wire_counter = 0
         self.wire_name_map: Dict[Tuple[int, int], str] = {}  # (comp_id, pin_id) -> nome
+        self._wire_source_cache: Dict[Tuple[int, int], str] = {}  # (owner_id, pin_id) -> nome
+
+    def _normalize_chip_name(self, name: str) -> Optional[str]:
+        """Normaliza nomes de chips DLS para nomes HDL válidos (memoizado por nome)"""
+        try:
+            return self._norm_cache[name]
+        except KeyError:
+            pass
+
+        mapped, warning = self._compute_normalized(name)
+        # Nomes brutos diferentes podem normalizar para o mesmo chip: avisar uma vez só
+        if warning and warning not in self._emitted_warnings:
+            self._emitted_warnings.add(warning)
+            self.warnings.append(warning)
+        self._norm_cache[name] = mapped
+        return mapped
 
-    def _normalize_chip_name(self, name: str) -> str:
-        """Normaliza nomes de chips DLS para nomes HDL válidos"""
+    @staticmethod
+    def _compute_normalized(name: str) -> Tuple[Optional[str], Optional[str]]:
+        """Calcula o nome HDL normalizado e o warning associado (se houver)"""
         # Remover caracteres especiais e espaços
         # Converter para CamelCase se tiver espaços
         if " " in name:
@@ -135,45 +254,67 @@ class FixedConverter:
         name = name.replace("-", "").replace("_", "")
 
         # Mapear chips DLS específicos para chips Hack
-        name_map = {
-            "NAND": "Nand",
-            "NOT": "Not",
-            "AND": "And",
-            "OR": "Or",
-            "XOR": "Xor",
-            "MUX": "Mux",
-            "DMUX": "DMux",
-            # Chips que NÃO EXISTEM no Hack (remover)
-            "8-1BIT": None,  # ❌ Splitter - usar sub-busing
-            "1-8BIT": None,  # ❌ Bus - usar sub-busing
-            "Splitter8": None,
-            "Bus8": None,
-        }
-
-        mapped = name_map.get(name, name)
+        mapped = _NAME_MAP.get(name, name)
 
         if mapped is None:
-            self.warnings.append(f"WARNING: Chip '{name}' nao existe no Hack chip-set. Sera ignorado.")
-            return None
+            return None, f"WARNING: Chip '{name}' nao existe no Hack chip-set. Sera ignorado."
 
         # Validar contra API do Hack
         if not HackChipAPI.is_valid_chip(mapped):
-            self.warnings.append(f"WARNING: Chip '{mapped}' nao encontrado na API do Hack chip-set.")
+            return mapped, f"WARNING: Chip '{mapped}' nao encontrado na API do Hack chip-set."
 
-        return mapped
+        return mapped, None
+
+    @staticmethod
+    def _disambiguate_pin_names(pins: Dict[int, dict]) -> Dict[int, str]:
+        """
+        Mapeia PinID -> nome HDL (minúsculas, sem espaços, internado);
+        nomes repetidos recebem sufixo (in, in1, in2...)
+        """
+        seen_names: Counter = Counter()
+        signames: Dict[int, str] = {}
+        for pin_id, pin in pins.items():
+            name = sys.intern(pin["Name"].lower().replace(" ", ""))
+            count = seen_names[name]
+            seen_names[name] += 1
+            signames[pin_id] = f"{name}{count}" if count else name
+        return signames
+
+    def _resolve_components(self):
+        """Resolve nome normalizado e I/O do Hack de cada componente (uma única vez)"""
+        for comp in self._components_list:
+            comp.normalized_name = self._normalize_chip_name(comp.name)
+            comp.chip_io = HackChipAPI.get_io(comp.normalized_name)
 
     def _map_wires_to_components(self):
-        """Mapeia wires para componentes"""
+        """Classifica as pontas de cada wire e mapeia wires para componentes (uma passada)"""
+        owner_kind = self._owner_kind
         for wire in self.wires:
+            # Um único dict.get por ponta do wire
+            source_kind, source_obj = owner_kind.get(wire.source_owner_id, _UNKNOWN_OWNER)
+            target_kind, target_obj = owner_kind.get(wire.target_owner_id, _UNKNOWN_OWNER)
+            wire.source_is_input = source_kind == "input"
+            wire.source_comp = source_obj if source_kind == "component" else None
+            wire.target_is_output = target_kind == "output"
+            wire.target_comp = target_obj if target_kind == "component" else None
+
             # Wire conecta A ENTRADA de um componente
-            if wire.target_owner_id in self.components:
-                comp = self.components[wire.target_owner_id]
-                comp.input_wires[wire.target_pin_id].append(wire)
+            comp = wire.target_comp
+            if comp is not None:
+                pin_wires = comp.input_wires.get(wire.target_pin_id)
+                if pin_wires is None:
+                    comp.input_pin_order.append(wire.target_pin_id)
+                    pin_wires = comp.input_wires[wire.target_pin_id] = []
+                pin_wires.append(wire)
 
             # Wire conecta A SAÍDA de um componente
-            if wire.source_owner_id in self.components:
-                comp = self.components[wire.source_owner_id]
-                comp.output_wires[wire.source_pin_id].append(wire)
+            comp = wire.source_comp
+            if comp is not None:
+                pin_wires = comp.output_wires.get(wire.source_pin_id)
+                if pin_wires is None:
+                    comp.output_pin_order.append(wire.source_pin_id)
+                    pin_wires = comp.output_wires[wire.source_pin_id] = []
+                pin_wires.append(wire)
 
     def _infer_pin_names(self):
         """
@@ -182,23 +323,20 @@ class FixedConverter:
         CORREÇÃO PRINCIPAL: Não usa PinIDs diretamente como nomes,
         mas mapeia pela ordem de conexão.
         """
-        for comp_id, comp in self.components.items():
-            normalized_name = self._normalize_chip_name(comp.name)
-
-            if normalized_name is None:
+        for comp in self._components_list:
+            if comp.normalized_name is None:
                 continue  # Chip inexistente, pular
 
-            chip_spec = HackChipAPI.get_chip_spec(normalized_name)
-
-            if not chip_spec:
+            if comp.chip_io is None:
                 # Chip customizado ou desconhecido - usar nomes genéricos
                 self._infer_generic_pin_names(comp)
                 continue
 
+            expected_inputs, expected_outputs = comp.chip_io
+
             # CRÍTICO: Mapear inputs pela ORDEM DE INSERÇÃO (não ordenar numericamente!)
             # Preservar ordem exata do JSON para manter circuito fiel ao original
-            input_pin_ids = list(comp.input_wires.keys())  # Mantém ordem de inserção
-            expected_inputs = chip_spec["inputs"]
+            input_pin_ids = comp.input_pin_order  # Mantém ordem de inserção
 
             if len(input_pin_ids) > len(expected_inputs):
                 self.warnings.append(
@@ -214,7 +352,6 @@ class FixedConverter:
 
             # CRÍTICO: Mapear outputs usando OutputPinColourInfo (ordem correta!)
             # OutputPinColourInfo contém os PinIDs na ordem real dos outputs do chip
-            expected_outputs = chip_spec["outputs"]
 
             if comp.output_pin_ids:  # Usar OutputPinColourInfo se disponível
                 for idx, pin_id in enumerate(comp.output_pin_ids):
@@ -224,7 +361,7 @@ class FixedConverter:
                         comp.output_pin_names[pin_id] = f"out{idx}"
             else:
                 # Fallback: usar ordem de inserção dos wires
-                output_pin_ids = list(comp.output_wires.keys())
+                output_pin_ids = comp.output_pin_order
 
                 if len(output_pin_ids) > len(expected_outputs):
                     self.warnings.append(
@@ -241,45 +378,107 @@ class FixedConverter:
     def _infer_generic_pin_names(self, comp: Component):
         """Gera nomes genéricos para chips desconhecidos"""
         # Preservar ordem de inserção (não ordenar!)
-        for idx, pin_id in enumerate(comp.input_wires.keys()):
+        for idx, pin_id in enumerate(comp.input_pin_order):
             comp.input_pin_names[pin_id] = f"in{idx}" if idx > 0 else "in"
 
-        for idx, pin_id in enumerate(comp.output_wires.keys()):
+        for idx, pin_id in enumerate(comp.output_pin_order):
             comp.output_pin_names[pin_id] = f"out{idx}" if idx > 0 else "out"
 
+    def _build_emit_plans(self):
+        """
+        Monta, para cada componente, a lista de triplas (pino, é output?, arg)
+        usada em convert_to(): arg é o primeiro wire de um input ou a lista de
+        wires de um output. Chamado só na primeira conversão, então quem usa
+        apenas generate_report() não paga por isso. Os nomes dos sinais
+        continuam sendo resolvidos na emissão (e na mesma ordem), então a
+        numeração w1, w2... não muda.
+        """
+        for comp in self._components_list:
+            if comp.normalized_name is None:
+                continue  # Chip inexistente, não é emitido
+
+            plan = comp.emit_plan
+
+            # Inputs do componente - PRESERVAR ORDEM DE INSERÇÃO!
+            for pin_id, wires in comp.input_wires.items():
+                # Usar o primeiro wire (geralmente só há um)
+                param_name = comp.input_pin_names.get(pin_id, f"in{pin_id}")
+                plan.append((param_name, False, wires[0]))
+
+            # Outputs do componente - USAR ORDEM CORRETA (OutputPinColourInfo)!
+            # Iterar na mesma ordem que OutputPinColourInfo para manter ordem correta
+            if comp.output_pin_ids:
+                output_pin_ids_ordered = comp.output_pin_ids
+            else:
+                output_pin_ids_ordered = comp.output_pin_order
+
+            for pin_id in output_pin_ids_ordered:
+                if pin_id not in comp.output_wires:
+                    continue  # Pino sem conexões
+
+                param_name = comp.output_pin_names.get(pin_id, f"out{pin_id}")
+                plan.append((param_name, True, comp.output_wires[pin_id]))
+
+    def _get_output_wire_name(self, wires: List[Wire]) -> str:
+        """Obtém o nome do sinal ligado a um output de componente (wires desse pino)"""
+        # Todos os wires saem do mesmo pino do mesmo componente
+        comp_id, pin_id = wires[0].source_owner_id, wires[0].source_pin_id
+
+        # Verificar (numa única passada) se conecta diretamente ao output do chip
+        output_pin = None
+        for wire in wires:
+            if wire.target_is_output:
+                output_pin = self.output_pins[wire.target_owner_id]
+                break
+
+        if output_pin is None:
+            # Wire interno
+            return self._get_or_create_wire_name(comp_id, pin_id)
+
+        # Conecta ao output do chip principal
+        main_outputs = self._main_output_names
+        if main_outputs is None:
+            return self._output_pin_signame[output_pin["ID"]]
+
+        # Usar nomes da API do Hack (índice do output precalculado)
+        idx = self._output_pin_index[output_pin["ID"]]
+        if idx < len(main_outputs):
+            return main_outputs[idx]
+        return self._get_or_create_wire_name(comp_id, pin_id)
+
     def _get_or_create_wire_name(self, comp_id: int, pin_id: int) -> str:
         """Cria ou retorna nome de wire interno"""
         key = (comp_id, pin_id)
-        if key not in self.wire_name_map:
+        name = self.wire_name_map.get(key)
+        if name is None:
             self.wire_counter += 1
-            self.wire_name_map[key] = f"w{self.wire_counter}"
-        return self.wire_name_map[key]
+            name = f"w{self.wire_counter}"
+            self.wire_name_map[key] = name
+        return name
 
     def _get_wire_source_name(self, wire: Wire) -> str:
-        """Obtém o nome da fonte de um wire"""
+        """Obtém o nome da fonte de um wire (cacheado por pino de origem)"""
+        key = (wire.source_owner_id, wire.source_pin_id)
+        name = self._wire_source_cache.get(key)
+        if name is None:
+            name = self._resolve_wire_source_name(wire)
+            self._wire_source_cache[key] = name
+        return name
+
+    def _resolve_wire_source_name(self, wire: Wire) -> str:
+        """Calcula o nome da fonte de um wire"""
         # Fonte é um input pin do chip principal
-        if wire.source_owner_id in self.input_pins:
-            pin = self.input_pins[wire.source_owner_id]
-            name = pin["Name"].lower()
-            bit_count = pin["BitCount"]
-
-            # Identificar qual input é (pode haver múltiplos com mesmo nome)
-            same_name_pins = [p for p in self.input_pins.values() if p["Name"] == pin["Name"]]
-            if len(same_name_pins) > 1:
-                # Adicionar índice numérico
-                pin_ids = sorted([p["ID"] for p in same_name_pins])
-                idx = pin_ids.index(pin["ID"])
-                if idx > 0:
-                    name = f"{name}{idx}"
+        if wire.source_is_input:
+            owner_id, pin_id = wire.source_owner_id, wire.source_pin_id
+            # Nome já desambiguado (pode haver múltiplos inputs com mesmo nome)
+            name = self._input_pin_signame[owner_id]
+            bit_count = self._input_pin_bits[owner_id]
 
             # Sub-busing para barramentos
-            if bit_count > 1 and wire.source_pin_id < bit_count:
-                return f"{name}[{wire.source_pin_id}]"
-
-            return name
+            return f"{name}[{pin_id}]" if bit_count > 1 and pin_id < bit_count else name
 
         # Fonte é output de um componente interno
-        elif wire.source_owner_id in self.components:
+        elif wire.source_comp is not None:
             return self._get_or_create_wire_name(wire.source_owner_id, wire.source_pin_id)
 
         return "unknown"
@@ -287,19 +486,10 @@ class FixedConverter:
     def _generate_hdl_signature(self) -> Tuple[str, str]:
         """Gera a assinatura IN/OUT do chip"""
         in_parts = []
-        seen_names = {}
-
         for pin_id, pin in self.input_pins.items():
-            name = pin["Name"].lower()
+            name = self._input_pin_signame[pin_id]  # Inputs duplicados já tratados
             bit_count = pin["BitCount"]
 
-            # Tratar inputs duplicados
-            if name in seen_names:
-                seen_names[name] += 1
-                name = f"{name}{seen_names[name] - 1}"
-            else:
-                seen_names[name] = 1
-
             if bit_count > 1:
                 in_parts.append(f"{name}[{bit_count}]")
             else:
@@ -307,7 +497,7 @@ class FixedConverter:
 
         out_parts = []
         for pin_id, pin in self.output_pins.items():
-            name = pin["Name"].lower().replace(" ", "")  # Remover espaços
+            name = self._output_pin_signame[pin_id]
             bit_count = pin["BitCount"]
 
             if bit_count > 1:
@@ -319,177 +509,171 @@ class FixedConverter:
 
     def convert(self) -> str:
         """Converte para HDL com todas as correções aplicadas"""
+        buf = io.StringIO()
+        self.convert_to(buf)
+        return buf.getvalue()
+
+    def convert_to(self, fp: TextIO) -> None:
+        """Escreve o HDL diretamente em fp (arquivo, stdout, StringIO...)"""
         in_sig, out_sig = self._generate_hdl_signature()
 
-        hdl = []
-        hdl.append("// Converted from Digital Logic Sim (Sebastian Lague)")
-        hdl.append(f"// Original chip: {self.data['Name']}")
-        hdl.append("// Fixed converter - compliant with Nand2tetris HDL specification")
-        hdl.append("")
-        hdl.append(f"CHIP {self.chip_name} {{")
-        hdl.append(f"    IN {in_sig};")
-        hdl.append(f"    OUT {out_sig};")
-        hdl.append("")
-        hdl.append("    PARTS:")
+        w = fp.write
+        w("// Converted from Digital Logic Sim (Sebastian Lague)\n")
+        w(f"// Original chip: {self.data['Name']}\n")
+        w("// Fixed converter - compliant with Nand2tetris HDL specification\n")
+        w("\n")
+        w(f"CHIP {self.chip_name} {{\n")
+        w(f"    IN {in_sig};\n")
+        w(f"    OUT {out_sig};\n")
+        w("\n")
+        w("    PARTS:\n")
+
+        if not self._emit_plans_built:
+            self._build_emit_plans()
+            self._emit_plans_built = True
+        input_signal = self._get_wire_source_name
+        output_signal = self._get_output_wire_name
 
         # Gerar instâncias de componentes
-        for comp_id, comp in self.components.items():
-            normalized_name = self._normalize_chip_name(comp.name)
+        for comp in self._components_list:
+            normalized_name = comp.normalized_name
 
             if normalized_name is None:
                 # Chip inexistente - adicionar comentário
-                hdl.append(f"    // SKIPPED: {comp.name} (não existe no Hack chip-set)")
+                w(f"    // SKIPPED: {comp.name} (não existe no Hack chip-set)\n")
                 continue
 
-            # Construir conexões
-            connections = []
-
-            # Inputs do componente - PRESERVAR ORDEM DE INSERÇÃO!
-            for pin_id in comp.input_wires.keys():
-                wires = comp.input_wires[pin_id]
-                if wires:
-                    # Usar o primeiro wire (geralmente só há um)
-                    wire = wires[0]
-                    source_name = self._get_wire_source_name(wire)
-                    param_name = comp.input_pin_names.get(pin_id, f"in{pin_id}")
-                    connections.append(f"{param_name}={source_name}")
-
-            # Outputs do componente - USAR ORDEM CORRETA (OutputPinColourInfo)!
-            # Iterar na mesma ordem que OutputPinColourInfo para manter ordem correta
-            if comp.output_pin_ids:
-                output_pin_ids_ordered = comp.output_pin_ids
-            else:
-                output_pin_ids_ordered = list(comp.output_wires.keys())
-
-            for pin_id in output_pin_ids_ordered:
-                if pin_id not in comp.output_wires:
-                    continue  # Pino sem conexões
-
-                wires = comp.output_wires[pin_id]
-
-                # Verificar se conecta diretamente ao output do chip
-                connects_to_output = any(
-                    w.target_owner_id in self.output_pins
-                    for w in wires
-                )
-
-                if connects_to_output:
-                    # Conecta ao output do chip principal
-                    # Usar nomes da API do Hack para outputs
-                    chip_spec = HackChipAPI.get_chip_spec(self.chip_name)
-
-                    output_pin = None
-                    for w in wires:
-                        if w.target_owner_id in self.output_pins:
-                            output_pin = self.output_pins[w.target_owner_id]
-                            break
-
-                    if chip_spec and output_pin:
-                        # Encontrar índice do output
-                        output_pins_list = list(self.output_pins.values())
-                        idx = output_pins_list.index(output_pin)
-                        if idx < len(chip_spec["outputs"]):
-                            wire_name = chip_spec["outputs"][idx]
-                        else:
-                            wire_name = self._get_or_create_wire_name(comp_id, pin_id)
-                    elif output_pin:
-                        wire_name = output_pin["Name"].lower().replace(" ", "")
-                    else:
-                        wire_name = self._get_or_create_wire_name(comp_id, pin_id)
-                else:
-                    # Wire interno
-                    wire_name = self._get_or_create_wire_name(comp_id, pin_id)
-
-                param_name = comp.output_pin_names.get(pin_id, f"out{pin_id}")
-                connections.append(f"{param_name}={wire_name}")
-
-            # Adicionar linha do componente
-            if connections:
-                conn_str = ", ".join(connections)
-                hdl.append(f"    {normalized_name}({conn_str});")
+            # Adicionar linha do componente (conexões seguem o plano precalculado)
+            if comp.emit_plan:
+                conn_str = ", ".join([
+                    f"{param}={output_signal(arg) if is_output else input_signal(arg)}"
+                    for param, is_output, arg in comp.emit_plan
+                ])
+                w(f"    {normalized_name}({conn_str});\n")
             else:
-                hdl.append(f"    // WARNING: {normalized_name} has no connections")
+                w(f"    // WARNING: {normalized_name} has no connections\n")
 
-        hdl.append("}")
+        w("}")
 
-        return "\n".join(hdl)
-
-    def generate_report(self) -> str:
-        """Gera relatório de conversão"""
-        lines = []
-        lines.append("=" * 70)
-        lines.append(f"RELATÓRIO DE CONVERSÃO: {self.data['Name']}")
-        lines.append("=" * 70)
-        lines.append("")
+    def generate_report(self, verbose: bool = True) -> str:
+        """Gera relatório de conversão (verbose: inclui o mapeamento de pinos de cada componente)"""
+        buf = io.StringIO()
+        w = buf.write
+        w("=" * 70 + "\n")
+        w(f"RELATÓRIO DE CONVERSÃO: {self.data['Name']}\n")
+        w("=" * 70 + "\n")
+        w("\n")
 
         # Warnings
         if self.warnings:
-            lines.append("WARNING:")
+            w("WARNING:\n")
             for warning in self.warnings:
-                lines.append(f"  {warning}")
-            lines.append("")
+                w(f"  {warning}\n")
+            w("\n")
 
         # Inputs
-        lines.append("ENTRADAS:")
+        w("ENTRADAS:\n")
         for pin_id, pin in self.input_pins.items():
-            lines.append(f"  {pin['Name']}: {pin['BitCount']} bit(s) [ID: {pin_id}]")
+            w(f"  {pin['Name']}: {pin['BitCount']} bit(s) [ID: {pin_id}]\n")
 
         # Outputs
-        lines.append("\nSAÍDAS:")
+        w("\nSAÍDAS:\n")
         for pin_id, pin in self.output_pins.items():
-            lines.append(f"  {pin['Name']}: {pin['BitCount']} bit(s) [ID: {pin_id}]")
+            w(f"  {pin['Name']}: {pin['BitCount']} bit(s) [ID: {pin_id}]\n")
 
         # Componentes
-        lines.append(f"\nCOMPONENTES ({len(self.components)}):")
-        for comp_id, comp in self.components.items():
-            normalized = self._normalize_chip_name(comp.name)
+        w(f"\nCOMPONENTES ({len(self.components)}):\n")
+        for comp in self._components_list:
+            normalized = comp.normalized_name
             status = "[OK]" if normalized else "[SKIP]"
-            lines.append(f"  {status} {comp.name} -> {normalized or 'SKIPPED'} [ID: {comp_id}]")
+            w(f"  {status} {comp.name} -> {normalized or 'SKIPPED'} [ID: {comp.id}]\n")
+
+            # Mostrar mapeamento de pinos (parte mais cara do relatório)
+            if not verbose or not normalized:
+                continue
 
-            # Mostrar mapeamento de pinos
-            if normalized and comp.input_pin_names:
-                lines.append("    Inputs:")
+            if comp.input_pin_names:
+                w("    Inputs:\n")
                 for pin_id, pin_name in comp.input_pin_names.items():
-                    lines.append(f"      PinID {pin_id} -> {pin_name}")
+                    w(f"      PinID {pin_id} -> {pin_name}\n")
 
-            if normalized and comp.output_pin_names:
-                lines.append("    Outputs:")
+            if comp.output_pin_names:
+                w("    Outputs:\n")
                 for pin_id, pin_name in comp.output_pin_names.items():
-                    lines.append(f"      PinID {pin_id} -> {pin_name}")
+                    w(f"      PinID {pin_id} -> {pin_name}\n")
+
+        w("\n" + "=" * 70)
+        return buf.getvalue()
+
 
-        lines.append("\n" + "=" * 70)
-        return "\n".join(lines)
+class _Tee:
+    """Repassa cada write para vários streams (ex.: stdout e o arquivo .hdl)"""
+    def __init__(self, *streams: TextIO):
+        self._writes = [stream.write for stream in streams]
+
+    def write(self, text: str) -> None:
+        for write in self._writes:
+            write(text)
+
+
+def _load_json(path: str) -> dict:
+    """Carrega o JSON do circuito (usa orjson se estiver instalado)"""
+    if orjson is not None:
+        with open(path, 'rb') as f:
+            return orjson.loads(f.read())
+
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+_KNOWN_FLAGS = {"--report", "--verbose"}
 
 
 def main():
-    if len(sys.argv) < 2:
-        print("Uso: python fixed_converter.py <arquivo.json>")
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    flags = {arg for arg in sys.argv[1:] if arg.startswith("--")}
+    unknown_flags = sorted(flags - _KNOWN_FLAGS)
+
+    if not args or unknown_flags:
+        if unknown_flags:
+            print(f"Opção desconhecida: {', '.join(unknown_flags)}\n")
+        print("Uso: python fixed_converter.py <arquivo.json> [--report] [--verbose]")
+        print("\n  --report   Mostra o relatório de conversão antes do HDL")
+        print("  --verbose  Relatório com o mapeamento de pinos de cada componente (implica --report)")
         print("\nEste conversor está em conformidade com as especificações do HDL Survival Guide.")
         sys.exit(1)
 
-    with open(sys.argv[1], 'r') as f:
-        data = json.load(f)
+    data = _load_json(args[0])
 
     converter = FixedConverter(data)
 
-    # Relatório
-    print(converter.generate_report())
-    print()
-
-    # HDL
-    hdl = converter.convert()
-    print(hdl)
-    print()
+    # Relatório (opcional - desligado por padrão para conversão em lote)
+    verbose = "--verbose" in flags
+    show_report = verbose or "--report" in flags
+    if show_report:
+        print(converter.generate_report(verbose=verbose))
+        print()
 
-    # Salvar
+    # HDL - escrito direto no terminal e no arquivo, sem montar a string inteira.
+    # Vai para um arquivo temporário e só substitui o .hdl se a conversão terminar
     output_file = f"{converter.chip_name}.hdl"
-    with open(output_file, 'w') as f:
-        f.write(hdl)
+    tmp_file = f"{output_file}.tmp"
+    try:
+        with open(tmp_file, 'w') as f:
+            converter.convert_to(_Tee(sys.stdout, f))
+        os.replace(tmp_file, output_file)
+    except BaseException:
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+        raise
+    print()
+    print()
 
     print(f"[OK] Arquivo salvo: {output_file}")
 
     if converter.warnings:
-        print(f"\nWARNING: {len(converter.warnings)} aviso(s) encontrado(s). Revise o relatorio acima.")
+        hint = "Revise o relatorio acima." if show_report else "Use --report para ver o relatorio."
+        print(f"\nWARNING: {len(converter.warnings)} aviso(s) encontrado(s). {hint}")
 
 
 if __name__ == "__main__":